@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from app.config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_QUEUE,
+    LLM_QUEUE_TIMEOUT,
+    LLM_TENANT_MAX_CONCURRENCY,
+)
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+# The guide endpoints are sync, so every admitted or queued request holds one
+# of AnyIO's worker threads (40 by default). Half of them stay free for the
+# other routes, such as /figma/file and the static assets.
+THREADPOOL_SIZE = 40
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request cannot be admitted to the LLM stage in time."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def tenant_id(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:12]
+
+
+class _Waiter:
+    __slots__ = ("tenant", "lane", "event", "admitted", "enqueued_at")
+
+    def __init__(self, tenant: str, lane: str) -> None:
+        self.tenant = tenant
+        self.lane = lane
+        self.event = threading.Event()
+        self.admitted = False
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        capacity: int = LLM_MAX_CONCURRENCY,
+        tenant_limit: int = LLM_TENANT_MAX_CONCURRENCY,
+        max_queue: int = LLM_MAX_QUEUE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+    ) -> None:
+        budget = THREADPOOL_SIZE // 2
+        if not 1 <= capacity <= budget:
+            raise ValueError(f"LLM concurrency must be between 1 and {budget}, got {capacity}")
+        self._capacity = capacity
+        self._tenant_limit = tenant_limit
+        self._max_queue = max(0, min(max_queue, budget - capacity))
+        self._queue_timeout = queue_timeout
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._tenant_active: dict[str, int] = {}
+        # One round-robin ring of tenants per lane; each tenant keeps its own FIFO.
+        self._queues: dict[str, OrderedDict[str, deque[_Waiter]]] = {
+            lane: OrderedDict() for lane in LANES
+        }
+        self._queued = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._avg_hold = 0.0
+        self._avg_wait = 0.0
+
+    @contextmanager
+    def admit(self, tenant: str, lane: str = INTERACTIVE) -> Iterator[None]:
+        self.acquire(tenant, lane)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(tenant, time.monotonic() - started)
+
+    def acquire(self, tenant: str, lane: str = INTERACTIVE) -> None:
+        if lane not in self._queues:
+            raise ValueError(f"Unknown admission lane: {lane}")
+
+        waiter = _Waiter(tenant, lane)
+        with self._lock:
+            # Anyone still queued while a slot is free is blocked by their own
+            # tenant limit, so taking the slot directly does not jump the line.
+            if (
+                self._active < self._capacity
+                and self._tenant_active.get(tenant, 0) < self._tenant_limit
+            ):
+                self._grant(tenant, 0.0)
+                return
+            if self._queued >= self._max_queue:
+                self._rejected += 1
+                raise AdmissionRejectedError("LLM queue is full", self._retry_after())
+            self._queues[lane].setdefault(tenant, deque()).append(waiter)
+            self._queued += 1
+            self._dispatch()
+
+        if waiter.event.wait(self._queue_timeout):
+            return
+
+        with self._lock:
+            if waiter.admitted:
+                return
+            queue = self._queues[lane]
+            waiters = queue[tenant]
+            waiters.remove(waiter)
+            if not waiters:
+                del queue[tenant]
+            self._queued -= 1
+            self._rejected += 1
+            retry_after = self._retry_after()
+
+        print(f"[admission] rejected tenant={tenant} lane={lane} retry_after={retry_after}")
+        raise AdmissionRejectedError("LLM capacity is exhausted", retry_after)
+
+    def release(self, tenant: str, held: float = 0.0) -> None:
+        with self._lock:
+            self._active -= 1
+            remaining = self._tenant_active[tenant] - 1
+            if remaining:
+                self._tenant_active[tenant] = remaining
+            else:
+                del self._tenant_active[tenant]
+            self._avg_hold = held if not self._avg_hold else 0.8 * self._avg_hold + 0.2 * held
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._active < self._capacity:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._queued -= 1
+            self._grant(waiter.tenant, time.monotonic() - waiter.enqueued_at)
+            waiter.admitted = True
+            waiter.event.set()
+
+    def _grant(self, tenant: str, wait: float) -> None:
+        self._avg_wait = wait if not self._admitted else 0.8 * self._avg_wait + 0.2 * wait
+        self._active += 1
+        self._admitted += 1
+        self._tenant_active[tenant] = self._tenant_active.get(tenant, 0) + 1
+
+    def _next_waiter(self) -> _Waiter | None:
+        for lane in LANES:
+            queue = self._queues[lane]
+            for tenant in list(queue):
+                if self._tenant_active.get(tenant, 0) >= self._tenant_limit:
+                    continue
+                waiters = queue[tenant]
+                waiter = waiters.popleft()
+                if waiters:
+                    queue.move_to_end(tenant)
+                else:
+                    del queue[tenant]
+                return waiter
+        return None
+
+    def _retry_after(self) -> int:
+        hold = self._avg_hold or self._queue_timeout
+        return max(1, math.ceil(hold * (self._queued + 1) / max(self._capacity, 1)))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            tenants: dict[str, dict[str, int]] = {}
+            for tenant, active in self._tenant_active.items():
+                tenants.setdefault(tenant, {"active": 0, "queued": 0})["active"] = active
+            for queue in self._queues.values():
+                for tenant, waiters in queue.items():
+                    tenants.setdefault(tenant, {"active": 0, "queued": 0})["queued"] += len(waiters)
+
+            return {
+                "capacity": self._capacity,
+                "max_queue": self._max_queue,
+                "active": self._active,
+                "queued": self._queued,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "avg_wait_seconds": round(self._avg_wait, 3),
+                "avg_hold_seconds": round(self._avg_hold, 3),
+                "lanes": {
+                    lane: sum(len(waiters) for waiters in queue.values())
+                    for lane, queue in self._queues.items()
+                },
+                "tenants": tenants,
+            }
+
+
+llm_admission = AdmissionController()
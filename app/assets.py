@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from starlette.responses import Response
+
+from app.config import STATIC_CACHE_CONTROL
+
+
+GZIP_MIN_SIZE = 256
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    content: bytes
+    media_type: str
+    etag: str
+    gzipped: bytes | None = None
+
+    @property
+    def gzip_etag(self) -> str:
+        return f'{self.etag[:-1]}-gz"'
+
+
+def _build_asset(path: str) -> StaticAsset:
+    with open(path, "rb") as handle:
+        content = handle.read()
+
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type = f"{media_type}; charset=utf-8"
+
+    gzipped = None
+    if len(content) >= GZIP_MIN_SIZE:
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) < len(content):
+            gzipped = compressed
+
+    etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+    return StaticAsset(content=content, media_type=media_type, etag=etag, gzipped=gzipped)
+
+
+@lru_cache(maxsize=None)
+def load_assets(directory: str) -> dict[str, StaticAsset]:
+    assets: dict[str, StaticAsset] = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            key = os.path.relpath(path, directory).replace(os.sep, "/")
+            assets[key] = _build_asset(path)
+    print(f"[assets] loaded directory={directory} files={len(assets)}")
+    return assets
+
+
+def asset_response(
+    asset: StaticAsset,
+    if_none_match: str | None = None,
+    accept_encoding: str | None = None,
+) -> Response:
+    use_gzip = asset.gzipped is not None and "gzip" in (accept_encoding or "")
+    etag = asset.gzip_etag if use_gzip else asset.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": STATIC_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(asset.gzipped, media_type=asset.media_type, headers=headers)
+    return Response(asset.content, media_type=asset.media_type, headers=headers)
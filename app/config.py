@@ -25,5 +25,43 @@ LLM_API_BASE = os.getenv(
 )
 LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
 LLM_MAX_NEW_TOKENS = int(os.getenv("LLM_MAX_NEW_TOKENS", "512"))
+LLM_MAX_NEW_TOKENS_LIMIT = int(os.getenv("LLM_MAX_NEW_TOKENS_LIMIT", "2048"))
+LLM_BRIEF_TOKENS = int(os.getenv("LLM_BRIEF_TOKENS", "192"))
+LLM_BRIEF_TOKENS_PER_ELEMENT = int(os.getenv("LLM_BRIEF_TOKENS_PER_ELEMENT", "12"))
+LLM_DETAILED_TOKENS = int(os.getenv("LLM_DETAILED_TOKENS", "384"))
+LLM_DETAILED_TOKENS_PER_ELEMENT = int(os.getenv("LLM_DETAILED_TOKENS_PER_ELEMENT", "40"))
+LLM_DISABLE_THINKING = os.getenv("LLM_DISABLE_THINKING", "0").lower() in ("1", "true", "yes")
+LLM_REASONING_MODEL = os.getenv("LLM_REASONING_MODEL", "1").lower() in ("1", "true", "yes")
+LLM_REASONING_TOKENS = int(os.getenv("LLM_REASONING_TOKENS", "1024"))
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.2"))
 HUGGINGFACE_API_TOKEN = os.getenv("HUGGINGFACE_API_TOKEN", "")
+
+FILTER_PARALLEL_THRESHOLD = int(os.getenv("FILTER_PARALLEL_THRESHOLD", "20000"))
+FILTER_MAX_WORKERS = int(os.getenv("FILTER_MAX_WORKERS", "0"))
+
+SEARCH_INDEX_CACHE_SIZE = int(os.getenv("SEARCH_INDEX_CACHE_SIZE", "64"))
+
+FILTER_RULES_PATH = os.getenv(
+    "FILTER_RULES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "filter_rules.json"),
+)
+
+HTTP_REPLAY_MODE = os.getenv("HTTP_REPLAY_MODE", "")
+if HTTP_REPLAY_MODE not in ("", "record", "replay"):
+    raise ValueError(f"HTTP_REPLAY_MODE must be 'record' or 'replay', got {HTTP_REPLAY_MODE!r}")
+HTTP_REPLAY_DIR = os.getenv("HTTP_REPLAY_DIR", "cassettes")
+HTTP_REPLAY_LATENCY_SCALE = float(os.getenv("HTTP_REPLAY_LATENCY_SCALE", "1.0"))
+
+RESPONSE_GZIP_MIN_SIZE = int(os.getenv("RESPONSE_GZIP_MIN_SIZE", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TENANT_MAX_CONCURRENCY = int(os.getenv("LLM_TENANT_MAX_CONCURRENCY", "2"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "16"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+
+STATIC_CACHE_CONTROL = os.getenv("STATIC_CACHE_CONTROL", "no-cache")
+
+STARTUP_MODE = os.getenv("STARTUP_MODE", "eager")
+if STARTUP_MODE not in ("eager", "lazy"):
+    raise ValueError(f"STARTUP_MODE must be 'eager' or 'lazy', got {STARTUP_MODE!r}")
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import re
-
-import httpx
+from typing import TYPE_CHECKING
 
 from app.config import FIGMA_API_BASE, REQUEST_TIMEOUT
 
+if TYPE_CHECKING:
+    import httpx
+
 
 class FigmaError(Exception):
     """Base error for Figma integration."""
@@ -57,6 +59,9 @@ class FigmaClient:
         timeout: float = REQUEST_TIMEOUT,
         transport: httpx.BaseTransport | None = None,
     ) -> None:
+        # httpx is the heaviest import in the app; defer it to the first client.
+        import httpx
+
         self._client = httpx.Client(base_url=base_url, timeout=timeout, transport=transport)
 
     def get_file(self, file_id: str, token: str) -> dict:
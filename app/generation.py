@@ -1,9 +1,29 @@
 from __future__ import annotations
 
 import json
+from dataclasses import dataclass
+from functools import lru_cache
 
+from app.config import (
+    LLM_BRIEF_TOKENS,
+    LLM_BRIEF_TOKENS_PER_ELEMENT,
+    LLM_DETAILED_TOKENS,
+    LLM_DETAILED_TOKENS_PER_ELEMENT,
+    LLM_MAX_NEW_TOKENS,
+    LLM_MAX_NEW_TOKENS_LIMIT,
+)
 
-def _limit_elements(filtered_json: dict, limit: int = 20) -> dict:
+
+ELEMENT_LIMIT = 20
+STOP_SEQUENCE = "END_OF_GUIDE"
+
+TOKEN_BUDGETS = {
+    "brief": (LLM_BRIEF_TOKENS, LLM_BRIEF_TOKENS_PER_ELEMENT),
+    "detailed": (LLM_DETAILED_TOKENS, LLM_DETAILED_TOKENS_PER_ELEMENT),
+}
+
+
+def _limit_elements(filtered_json: dict, limit: int = ELEMENT_LIMIT) -> dict:
     if not filtered_json or "screens" not in filtered_json:
         return filtered_json
 
@@ -27,25 +47,94 @@ def _limit_elements(filtered_json: dict, limit: int = 20) -> dict:
     return trimmed
 
 
+SYSTEM_PROMPT = (
+    "Ты — технический писатель. Сгенерируй пошаговое руководство по интерфейсу. "
+    "Ответ должен содержать два раздела: MARKDOWN и JSON. "
+    "В JSON укажи: title, steps (массив объектов с полями index, title, description).\n\n"
+    "Формат ответа:\n"
+    "MARKDOWN:\n<текст>\n\nJSON:\n<json>\n"
+    f"{STOP_SEQUENCE}\n\n"
+    f"Сразу после JSON напиши {STOP_SEQUENCE} и больше ничего не добавляй."
+)
+
+DATA_HEADER = "Данные об интерфейсе (JSON):\n"
+
+LANGUAGES = ("ru", "en")
+DETAIL_LEVELS = {
+    "brief": "Опиши только ключевые сценарии, 3–5 шагов.",
+    "detailed": "Опиши все значимые элементы и сценарии по шагам.",
+}
+AUDIENCES = {
+    "user": "Пиши простым языком, без технических терминов.",
+    "developer": "Указывай названия элементов и их назначение.",
+    "engineer": "Добавляй технические детали о поведении элементов.",
+}
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    system: str
+    parameters: str
+
+    def render(self, data: str) -> str:
+        return f"{DATA_HEADER}{data}\n\n{self.parameters}"
+
+
+@lru_cache(maxsize=128)
+def get_template(language: str, detail_level: str, audience: str) -> PromptTemplate:
+    lines = [
+        f"Язык: {language}",
+        f"Детализация: {detail_level}",
+        f"Аудитория: {audience}",
+    ]
+    hints = [DETAIL_LEVELS.get(detail_level), AUDIENCES.get(audience)]
+    lines.extend(hint for hint in hints if hint)
+    return PromptTemplate(system=SYSTEM_PROMPT, parameters="\n".join(lines))
+
+
+def precompile_templates() -> None:
+    for language in LANGUAGES:
+        for detail_level in DETAIL_LEVELS:
+            for audience in AUDIENCES:
+                get_template(language, detail_level, audience)
+
+
+precompile_templates()
+
+
+def build_messages(
+    filtered_json: dict,
+    language: str,
+    detail_level: str,
+    audience: str,
+) -> tuple[str, str]:
+    # Static instructions come first and never vary, then the per-file data,
+    # then the per-request parameters, so providers can reuse the cached prefix.
+    template = get_template(language, detail_level, audience)
+    limited_json = _limit_elements(filtered_json)
+    data = json.dumps(limited_json, ensure_ascii=False)
+    return template.system, template.render(data)
+
+
 def build_prompt(
     filtered_json: dict,
     language: str,
     detail_level: str,
     audience: str,
 ) -> str:
-    limited_json = _limit_elements(filtered_json, limit=20)
-    return (
-        "Ты — технический писатель. Сгенерируй пошаговое руководство по интерфейсу. "
-        "Ответ должен содержать два раздела: MARKDOWN и JSON. "
-        "В JSON укажи: title, steps (массив объектов с полями index, title, description).\n\n"
-        f"Язык: {language}\n"
-        f"Детализация: {detail_level}\n"
-        f"Аудитория: {audience}\n\n"
-        "Данные об интерфейсе (JSON):\n"
-        f"{json.dumps(limited_json, ensure_ascii=False)}\n\n"
-        "Формат ответа:\n"
-        "MARKDOWN:\n<текст>\n\nJSON:\n<json>"
-    )
+    system, user = build_messages(filtered_json, language, detail_level, audience)
+    return f"{system}\n\n{user}"
+
+
+def output_budget(filtered_json: dict, detail_level: str) -> int:
+    if detail_level not in TOKEN_BUDGETS:
+        return min(LLM_MAX_NEW_TOKENS, LLM_MAX_NEW_TOKENS_LIMIT)
+
+    screens = (filtered_json or {}).get("screens", [])
+    element_count = sum(len(screen.get("elements", [])) for screen in screens)
+    base, per_element = TOKEN_BUDGETS[detail_level]
+    budget = base + per_element * min(element_count, ELEMENT_LIMIT)
+    return min(budget, LLM_MAX_NEW_TOKENS_LIMIT)
 
 
 def parse_llm_output(text: str) -> tuple[str, dict]:
@@ -57,7 +146,12 @@ def parse_llm_output(text: str) -> tuple[str, dict]:
             break
         cleaned = cleaned[:start] + cleaned[end + len("</think>") :]
 
-    cleaned = cleaned.replace("<think>", "").replace("</think>", "")
+    # An unclosed think block means generation stopped mid-reasoning.
+    if "<think>" in cleaned:
+        cleaned = cleaned[: cleaned.find("<think>")]
+    cleaned = cleaned.replace("</think>", "")
+    # Reasoning may quote the marker, so only cut after think blocks are gone.
+    cleaned = cleaned.split(STOP_SEQUENCE, 1)[0]
 
     if "JSON:" not in cleaned:
         return cleaned.strip(), {"markdown": cleaned.strip()}
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
-import httpx
+from typing import TYPE_CHECKING
 
 from app.config import (
     HUGGINGFACE_API_TOKEN,
     LLM_API_BASE,
+    LLM_DISABLE_THINKING,
     LLM_MAX_NEW_TOKENS,
     LLM_MODEL_NAME,
     LLM_MODEL_SUFFIX,
     LLM_PROVIDER,
+    LLM_REASONING_MODEL,
+    LLM_REASONING_TOKENS,
     LLM_TEMPERATURE,
     LLM_TIMEOUT,
 )
 
+if TYPE_CHECKING:
+    import httpx
+
 
 class LLMError(Exception):
     """Base error for LLM integration."""
@@ -22,6 +28,18 @@ class LLMRequestError(LLMError):
     """Raised when LLM API returns an error."""
 
 
+DEFAULT_SYSTEM_PROMPT = "You are a technical writer."
+NO_THINK_FLAG = "/no_think"
+
+
+def _messages(prompt: str, system: str | None) -> list[dict[str, str]]:
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
 class LLMClient:
     def __init__(
         self,
@@ -31,20 +49,50 @@ class LLMClient:
         hf_token: str = HUGGINGFACE_API_TOKEN,
         timeout: float = LLM_TIMEOUT,
         transport: httpx.BaseTransport | None = None,
+        disable_thinking: bool = LLM_DISABLE_THINKING,
+        reasoning_model: bool = LLM_REASONING_MODEL,
     ) -> None:
+        import httpx
+
         self._client = httpx.Client(base_url=base_url, timeout=timeout, transport=transport)
         self._model = model
         self._provider = provider
         self._hf_token = hf_token
+        self._disable_thinking = disable_thinking
+        self._emits_reasoning = reasoning_model and not disable_thinking
+
+    def _system_prompt(self, system: str | None) -> str | None:
+        if not self._disable_thinking:
+            return system
+        # SmolLM3/Qwen3-style chat templates switch reasoning off on this flag.
+        return f"{NO_THINK_FLAG}\n{system}" if system else NO_THINK_FLAG
+
+    def generate(
+        self,
+        prompt: str,
+        system: str | None = None,
+        max_new_tokens: int = LLM_MAX_NEW_TOKENS,
+        stop: list[str] | None = None,
+    ) -> str:
+        if self._emits_reasoning:
+            # The reasoning trace may repeat the stop marker from the instructions
+            # and would end generation inside the think block; it also needs room
+            # of its own on top of the answer budget.
+            stop = None
+            max_new_tokens += LLM_REASONING_TOKENS
 
-    def generate(self, prompt: str) -> str:
         if self._provider == "hf":
+            system = self._system_prompt(system)
+            parameters = {
+                "temperature": LLM_TEMPERATURE,
+                "max_new_tokens": max_new_tokens,
+                "return_full_text": False,
+            }
+            if stop:
+                parameters["stop"] = stop
             payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "temperature": LLM_TEMPERATURE,
-                    "max_new_tokens": LLM_MAX_NEW_TOKENS,
-                },
+                "inputs": f"{system}\n\n{prompt}" if system else prompt,
+                "parameters": parameters,
                 "options": {"wait_for_model": True},
             }
             headers = {}
@@ -76,12 +124,13 @@ class LLMClient:
             )
             payload = {
                 "model": model_id,
-                "messages": [
-                    {"role": "user", "content": prompt},
-                ],
+                "messages": _messages(prompt, self._system_prompt(system)),
                 "temperature": LLM_TEMPERATURE,
+                "max_tokens": max_new_tokens,
                 "stream": False,
             }
+            if stop:
+                payload["stop"] = stop
             headers = {"Content-Type": "application/json"}
             if self._hf_token:
                 headers["Authorization"] = f"Bearer {self._hf_token}"
@@ -106,12 +155,12 @@ class LLMClient:
 
         payload = {
             "model": self._model,
-            "messages": [
-                {"role": "system", "content": "You are a technical writer."},
-                {"role": "user", "content": prompt},
-            ],
+            "messages": _messages(prompt, self._system_prompt(system or DEFAULT_SYSTEM_PROMPT)),
             "temperature": LLM_TEMPERATURE,
+            "max_tokens": max_new_tokens,
         }
+        if stop:
+            payload["stop"] = stop
 
         print(f"[llm] provider=openai base_url={self._client.base_url} path=/v1/chat/completions")
         response = self._client.post("/v1/chat/completions", json=payload)
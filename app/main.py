@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 
-from fastapi import Depends, FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
 
+from app.admission import (
+    BATCH,
+    INTERACTIVE,
+    AdmissionController,
+    AdmissionRejectedError,
+    llm_admission,
+    tenant_id,
+)
+from app.assets import asset_response, load_assets
 from app.figma import (
     FigmaAuthError,
     FigmaBadUrlError,
@@ -17,10 +25,24 @@ from app.figma import (
     extract_file_id,
 )
 from app.filtering import filter_figma_json
-from app.generation import build_prompt, parse_llm_output
+from app.generation import (
+    STOP_SEQUENCE,
+    build_messages,
+    output_budget,
+    parse_llm_output,
+)
 from app.llm import LLMClient, LLMRequestError
-from app.config import FIGMA_API_TOKEN
+from app.rules import get_rules
+from app.search import get_index, select_focus
+from app.config import (
+    FIGMA_API_TOKEN,
+    HTTP_REPLAY_MODE,
+    RESPONSE_GZIP_LEVEL,
+    RESPONSE_GZIP_MIN_SIZE,
+    STARTUP_MODE,
+)
 from app.schemas import (
+    AdmissionStatsResponse,
     FigmaFileRequest,
     FigmaFileResponse,
     FigmaFilteredResponse,
@@ -29,13 +51,19 @@ from app.schemas import (
     GuideResponse,
 )
 
+if TYPE_CHECKING:
+    import httpx
+
 app = FastAPI(title="Figma UI User Guider", version="0.1.0")
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=RESPONSE_GZIP_MIN_SIZE,
+    compresslevel=RESPONSE_GZIP_LEVEL,
+)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 WEB_DIR = BASE_DIR / "web"
 
-app.mount("/static", StaticFiles(directory=WEB_DIR), name="static")
-
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -44,13 +72,46 @@ async def log_requests(request: Request, call_next):
     return response
 
 
-@app.get("/")
-def index() -> FileResponse:
-    return FileResponse(WEB_DIR / "index.html")
+def _serve_asset(path: str, request: Request) -> Response:
+    asset = load_assets(str(WEB_DIR)).get(path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return asset_response(
+        asset,
+        if_none_match=request.headers.get("if-none-match"),
+        accept_encoding=request.headers.get("accept-encoding"),
+    )
+
+
+@app.api_route("/", methods=["GET", "HEAD"])
+def index(request: Request) -> Response:
+    return _serve_asset("index.html", request)
+
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+def static_asset(path: str, request: Request) -> Response:
+    return _serve_asset(path, request)
+
+
+def get_http_transport() -> httpx.BaseTransport | None:
+    # The record/replay transport subclasses httpx types, so only import it
+    # when it is actually enabled.
+    if not HTTP_REPLAY_MODE:
+        return None
+    from app.replay import get_transport
+
+    return get_transport()
+
+
+def warm_up() -> None:
+    import httpx  # noqa: F401
+
+    load_assets(str(WEB_DIR))
+    get_rules()
 
 
 def get_figma_client() -> Generator[FigmaClient, None, None]:
-    client = FigmaClient()
+    client = FigmaClient(transport=get_http_transport())
     try:
         yield client
     finally:
@@ -58,13 +119,24 @@ def get_figma_client() -> Generator[FigmaClient, None, None]:
 
 
 def get_llm_client() -> Generator[LLMClient, None, None]:
-    client = LLMClient()
+    client = LLMClient(transport=get_http_transport())
     try:
         yield client
     finally:
         client.close()
 
 
+def get_admission() -> AdmissionController:
+    return llm_admission
+
+
+@app.get("/admission/stats", response_model=AdmissionStatsResponse)
+def admission_stats(
+    admission: AdmissionController = Depends(get_admission),
+) -> AdmissionStatsResponse:
+    return AdmissionStatsResponse(**admission.stats())
+
+
 @app.post("/figma/file", response_model=FigmaFileResponse)
 def fetch_figma_file(
     payload: FigmaFileRequest,
@@ -108,11 +180,25 @@ def fetch_filtered_figma_file(
         raise HTTPException(status_code=429, detail=str(exc)) from exc
 
 
+def _filter_for_guide(file_id: str, data: dict, focus: str) -> dict:
+    if not focus:
+        return filter_figma_json(data)
+
+    filtered, index = get_index(
+        file_id,
+        data.get("version"),
+        lambda: filter_figma_json(data),
+        get_rules().version,
+    )
+    return select_focus(filtered, index, focus)
+
+
 @app.post("/guide/generate", response_model=GuideResponse)
 def generate_guide(
     payload: GuideRequest,
     client: FigmaClient = Depends(get_figma_client),
     llm: LLMClient = Depends(get_llm_client),
+    admission: AdmissionController = Depends(get_admission),
 ) -> GuideResponse:
     try:
         token = payload.figma_token or FIGMA_API_TOKEN
@@ -120,14 +206,20 @@ def generate_guide(
             raise HTTPException(status_code=400, detail="Figma token is required")
         file_id = extract_file_id(payload.figma_url)
         data = client.get_file(file_id, token)
-        filtered = filter_figma_json(data)
-        prompt = build_prompt(
+        filtered = _filter_for_guide(file_id, data, payload.focus)
+        system, prompt = build_messages(
             filtered,
             language=payload.language,
             detail_level=payload.detail_level,
             audience=payload.audience,
         )
-        output = llm.generate(prompt)
+        with admission.admit(tenant_id(token), lane=INTERACTIVE):
+            output = llm.generate(
+                prompt,
+                system=system,
+                max_new_tokens=output_budget(filtered, payload.detail_level),
+                stop=[STOP_SEQUENCE],
+            )
         markdown, guide_json = parse_llm_output(output)
         return GuideResponse(file_id=file_id, markdown=markdown, guide_json=guide_json)
     except FigmaBadUrlError as exc:
@@ -142,6 +234,12 @@ def generate_guide(
         raise HTTPException(status_code=429, detail=str(exc)) from exc
     except LLMRequestError as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
+    except AdmissionRejectedError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
 
 
 @app.post("/guide/export", response_model=GuideExportResponse)
@@ -149,6 +247,7 @@ def export_guide(
     payload: GuideRequest,
     client: FigmaClient = Depends(get_figma_client),
     llm: LLMClient = Depends(get_llm_client),
+    admission: AdmissionController = Depends(get_admission),
 ) -> GuideExportResponse:
     try:
         token = payload.figma_token or FIGMA_API_TOKEN
@@ -156,14 +255,20 @@ def export_guide(
             raise HTTPException(status_code=400, detail="Figma token is required")
         file_id = extract_file_id(payload.figma_url)
         data = client.get_file(file_id, token)
-        filtered = filter_figma_json(data)
-        prompt = build_prompt(
+        filtered = _filter_for_guide(file_id, data, payload.focus)
+        system, prompt = build_messages(
             filtered,
             language=payload.language,
             detail_level=payload.detail_level,
             audience=payload.audience,
         )
-        output = llm.generate(prompt)
+        with admission.admit(tenant_id(token), lane=BATCH):
+            output = llm.generate(
+                prompt,
+                system=system,
+                max_new_tokens=output_budget(filtered, payload.detail_level),
+                stop=[STOP_SEQUENCE],
+            )
         markdown, guide_json = parse_llm_output(output)
         return GuideExportResponse(file_id=file_id, markdown=markdown, guide_json=guide_json)
     except FigmaBadUrlError as exc:
@@ -178,3 +283,13 @@ def export_guide(
         raise HTTPException(status_code=429, detail=str(exc)) from exc
     except LLMRequestError as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
+    except AdmissionRejectedError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
+
+if STARTUP_MODE == "eager":
+    warm_up()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import time
+
+import httpx
+
+from app.config import HTTP_REPLAY_DIR, HTTP_REPLAY_LATENCY_SCALE, HTTP_REPLAY_MODE
+
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Bodies are stored already decoded, so transfer-level headers no longer apply.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+MISS_STATUS = 502
+MISS_HEADER = "X-Replay-Miss"
+
+
+def cassette_key(request: httpx.Request) -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(str(request.url).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(request.content)
+    return digest.hexdigest()
+
+
+class RecordReplayTransport(httpx.BaseTransport):
+    def __init__(
+        self,
+        directory: str,
+        mode: str = REPLAY,
+        latency_scale: float = 1.0,
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self._directory = directory
+        self._mode = mode
+        self._latency_scale = latency_scale
+        # Replay never touches the network, so only build a real transport
+        # (and its SSL context) when recording.
+        self._transport = (transport or httpx.HTTPTransport()) if mode == RECORD else None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, request: httpx.Request) -> str:
+        return os.path.join(self._directory, f"{cassette_key(request)}.json.gz")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        if self._mode == RECORD:
+            return self._record(request)
+        return self._replay(request)
+
+    def _record(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        elapsed = time.perf_counter() - started
+
+        headers = [
+            (key, value)
+            for key, value in response.headers.multi_items()
+            if key.lower() not in _DROPPED_HEADERS
+        ]
+        cassette = {
+            "method": request.method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "headers": headers,
+            "body": base64.b64encode(content).decode("ascii"),
+            "elapsed": elapsed,
+        }
+        with gzip.open(self._path(request), "wt", encoding="utf-8") as handle:
+            json.dump(cassette, handle)
+        print(
+            "[replay] recorded method=%s url=%s status=%s elapsed=%.3f"
+            % (request.method, request.url, response.status_code, elapsed)
+        )
+
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+        )
+
+    def _replay(self, request: httpx.Request) -> httpx.Response:
+        path = self._path(request)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                cassette = json.load(handle)
+        except FileNotFoundError:
+            # Answer like a failing upstream, so the clients report it through
+            # their usual error path instead of a transport exception.
+            print(f"[replay] miss method={request.method} url={request.url}")
+            return httpx.Response(
+                MISS_STATUS,
+                headers={MISS_HEADER: "1"},
+                text=f"No cassette for {request.method} {request.url}",
+                request=request,
+            )
+
+        delay = cassette.get("elapsed", 0.0) * self._latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        return httpx.Response(
+            cassette["status_code"],
+            headers=[tuple(item) for item in cassette["headers"]],
+            content=base64.b64decode(cassette["body"]),
+            request=request,
+        )
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+
+def get_transport() -> httpx.BaseTransport | None:
+    if not HTTP_REPLAY_MODE:
+        return None
+    return RecordReplayTransport(
+        HTTP_REPLAY_DIR,
+        mode=HTTP_REPLAY_MODE,
+        latency_scale=HTTP_REPLAY_LATENCY_SCALE,
+    )
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import FILTER_RULES_PATH
+
+
+class RulesError(Exception):
+    """Raised when filter rules cannot be loaded or compiled."""
+
+
+@dataclass(frozen=True)
+class Rule:
+    kind: str
+    types: frozenset[str] = frozenset()
+    component_ids: frozenset[str] = frozenset()
+    name: re.Pattern[str] | None = None
+    visible: bool | None = None
+    min_width: float | None = None
+    max_width: float | None = None
+    min_height: float | None = None
+    max_height: float | None = None
+
+    def matches(self, node: dict[str, Any], name: str) -> bool:
+        if self.component_ids and node.get("componentId") not in self.component_ids:
+            return False
+        if self.name is not None and not self.name.search(name):
+            return False
+        if self.visible is not None and node.get("visible", True) != self.visible:
+            return False
+        if (
+            self.min_width is None
+            and self.max_width is None
+            and self.min_height is None
+            and self.max_height is None
+        ):
+            return True
+
+        box = node.get("absoluteBoundingBox") or {}
+        width = box.get("width")
+        height = box.get("height")
+        if width is None or height is None:
+            return False
+        if self.min_width is not None and width < self.min_width:
+            return False
+        if self.max_width is not None and width > self.max_width:
+            return False
+        if self.min_height is not None and height < self.min_height:
+            return False
+        if self.max_height is not None and height > self.max_height:
+            return False
+        return True
+
+
+class RuleSet:
+    def __init__(
+        self,
+        rules: list[Rule],
+        skip_hidden: bool = False,
+        version: str = "",
+    ) -> None:
+        self.rules = rules
+        self.skip_hidden = skip_hidden
+        self.version = version
+
+        patterns = [f"(?:{rule.name.pattern})" for rule in rules if rule.name is not None]
+        try:
+            self._name_filter = (
+                re.compile("|".join(patterns), re.IGNORECASE) if patterns else None
+            )
+        except re.error as exc:
+            raise RulesError(f"Cannot combine filter rule patterns: {exc}") from exc
+
+        # Rules are pre-bucketed by node type, and each bucket is split into
+        # "any rule" and "rules without a name pattern", so a node whose name
+        # misses the combined regex only walks the rules that can still match.
+        types = {node_type for rule in rules for node_type in rule.types}
+        self._by_type = {node_type: self._bucket(node_type) for node_type in types}
+        self._default = self._bucket(None)
+
+    def _bucket(self, node_type: str | None) -> tuple[tuple[Rule, ...], tuple[Rule, ...]]:
+        candidates = tuple(
+            rule for rule in self.rules if not rule.types or node_type in rule.types
+        )
+        return candidates, tuple(rule for rule in candidates if rule.name is None)
+
+    def classify(self, node: dict[str, Any]) -> str | None:
+        candidates, nameless = self._by_type.get(node.get("type"), self._default)
+        name = (node.get("name") or "").strip().lower()
+        if self._name_filter is None or not self._name_filter.search(name):
+            candidates = nameless
+
+        for rule in candidates:
+            if rule.matches(node, name):
+                return rule.kind
+        return None
+
+
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _compile_name(pattern: str) -> re.Pattern[str]:
+    # Every name pattern is embedded in one combined alternation, so it must
+    # not carry anything that only works in a standalone regex.
+    compiled = re.compile(f"(?:{pattern})", re.IGNORECASE)
+    if compiled.groupindex:
+        raise ValueError("named groups are not allowed in name patterns")
+    if _BACKREFERENCE.search(pattern):
+        raise ValueError("backreferences are not allowed in name patterns")
+    return compiled
+
+
+def _optional_float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+def compile_rules(config: dict[str, Any]) -> RuleSet:
+    rules: list[Rule] = []
+    for position, raw in enumerate(config.get("rules", [])):
+        try:
+            name = raw.get("name")
+            rules.append(
+                Rule(
+                    kind=raw["kind"],
+                    types=frozenset(raw.get("types", [])),
+                    component_ids=frozenset(raw.get("component_ids", [])),
+                    name=_compile_name(name) if name else None,
+                    visible=raw.get("visible"),
+                    min_width=_optional_float(raw.get("min_width")),
+                    max_width=_optional_float(raw.get("max_width")),
+                    min_height=_optional_float(raw.get("min_height")),
+                    max_height=_optional_float(raw.get("max_height")),
+                )
+            )
+        except (KeyError, TypeError, ValueError, re.error) as exc:
+            raise RulesError(f"Invalid filter rule #{position}: {exc}") from exc
+
+    return RuleSet(rules, skip_hidden=bool(config.get("skip_hidden", False)))
+
+
+def load_rules(path: str) -> RuleSet:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            config = json.load(handle)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise RulesError(f"Cannot load filter rules from {path}: {exc}") from exc
+    return compile_rules(config)
+
+
+_cached: tuple[str, float, RuleSet] | None = None
+
+
+def get_rules(path: str = FILTER_RULES_PATH) -> RuleSet:
+    global _cached
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError as exc:
+        if _cached is not None and _cached[0] == path:
+            return _cached[2]
+        raise RulesError(f"Cannot load filter rules from {path}: {exc}") from exc
+
+    if _cached is not None and _cached[0] == path and _cached[1] == mtime:
+        return _cached[2]
+
+    try:
+        rules = load_rules(path)
+    except RulesError as exc:
+        if _cached is not None and _cached[0] == path:
+            print(f"[rules] reload_failed path={path} error={exc}")
+            return _cached[2]
+        raise
+
+    print(f"[rules] loaded path={path} rules={len(rules.rules)}")
+    rules.version = f"{path}:{mtime}"
+    _cached = (path, mtime, rules)
+    return rules
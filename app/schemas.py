@@ -24,6 +24,7 @@ class GuideRequest(BaseModel):
     language: str = "ru"
     detail_level: str = "brief"
     audience: str = "user"
+    focus: str = ""
 
 
 class GuideResponse(BaseModel):
@@ -36,3 +37,16 @@ class GuideExportResponse(BaseModel):
     file_id: str
     markdown: str
     guide_json: dict
+
+
+class AdmissionStatsResponse(BaseModel):
+    capacity: int
+    max_queue: int
+    active: int
+    queued: int
+    admitted: int
+    rejected: int
+    avg_wait_seconds: float
+    avg_hold_seconds: float
+    lanes: dict[str, int]
+    tenants: dict[str, dict[str, int]]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Callable
+
+from app.config import SEARCH_INDEX_CACHE_SIZE
+
+
+SCREEN_REF = -1
+MIN_PREFIX_LENGTH = 3
+
+_TOKEN_RE = re.compile(r"\w+")
+
+_index_cache: OrderedDict[
+    tuple[str, str, str], tuple[dict[str, Any], dict[str, Any]]
+] = OrderedDict()
+
+
+def _tokenize(value: str | None) -> list[str]:
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+def build_index(filtered_json: dict[str, Any]) -> dict[str, Any]:
+    postings: dict[str, set[tuple[int, int]]] = {}
+
+    def add(value: str | None, ref: tuple[int, int]) -> None:
+        for token in _tokenize(value):
+            postings.setdefault(token, set()).add(ref)
+
+    for screen_pos, screen in enumerate(filtered_json.get("screens", [])):
+        add(screen.get("name"), (screen_pos, SCREEN_REF))
+        for element_pos, element in enumerate(screen.get("elements", [])):
+            ref = (screen_pos, element_pos)
+            add(element.get("name"), ref)
+            add(element.get("text"), ref)
+            add(element.get("kind"), ref)
+
+    return {
+        "tokens": sorted(postings),
+        "postings": {token: sorted(refs) for token, refs in postings.items()},
+    }
+
+
+def get_index(
+    file_id: str,
+    version: str | None,
+    build_document: Callable[[], dict[str, Any]],
+    rules_version: str = "",
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    # The index stores positions, so it is cached together with the exact
+    # filtered document it was built from and must only be applied to that.
+    # The document is only built on a cache miss.
+    if not version:
+        filtered_json = build_document()
+        return filtered_json, build_index(filtered_json)
+
+    key = (file_id, str(version), rules_version)
+    entry = _index_cache.get(key)
+    if entry is not None:
+        _index_cache.move_to_end(key)
+        return entry
+
+    filtered_json = build_document()
+    entry = (filtered_json, build_index(filtered_json))
+    _index_cache[key] = entry
+    while len(_index_cache) > SEARCH_INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+    return entry
+
+
+def _lookup(index: dict[str, Any], term: str) -> set[tuple[int, int]]:
+    postings = index["postings"]
+    if len(term) < MIN_PREFIX_LENGTH:
+        return set(postings.get(term, ()))
+
+    tokens = index["tokens"]
+    refs: set[tuple[int, int]] = set()
+    pos = bisect_left(tokens, term)
+    while pos < len(tokens) and tokens[pos].startswith(term):
+        refs.update(postings[tokens[pos]])
+        pos += 1
+    return refs
+
+
+def search(index: dict[str, Any], query: str) -> dict[tuple[int, int], set[str]]:
+    matches: dict[tuple[int, int], set[str]] = {}
+    for term in set(_tokenize(query)):
+        for ref in _lookup(index, term):
+            matches.setdefault(ref, set()).add(term)
+    return matches
+
+
+def select_focus(
+    filtered_json: dict[str, Any],
+    index: dict[str, Any],
+    query: str,
+) -> dict[str, Any]:
+    matches = search(index, query)
+    screens = filtered_json.get("screens", [])
+
+    candidates: set[tuple[int, int]] = set()
+    for screen_pos, element_pos in matches:
+        if element_pos != SCREEN_REF:
+            candidates.add((screen_pos, element_pos))
+            continue
+        element_count = len(screens[screen_pos].get("elements", []))
+        candidates.update((screen_pos, pos) for pos in range(element_count))
+
+    selected: dict[int, list[dict[str, Any]]] = {}
+    if candidates:
+        scores = {
+            ref: len(matches.get((ref[0], SCREEN_REF), set()) | matches.get(ref, set()))
+            for ref in candidates
+        }
+        best = max(scores.values())
+        for screen_pos, element_pos in sorted(
+            ref for ref, score in scores.items() if score == best
+        ):
+            elements = screens[screen_pos].get("elements", [])
+            selected.setdefault(screen_pos, []).append(elements[element_pos])
+    else:
+        # Only empty screens matched: still narrow the guide down to them.
+        for screen_pos, element_pos in sorted(matches):
+            if element_pos == SCREEN_REF:
+                selected[screen_pos] = []
+
+    # Nothing matched at all: fall back to the whole document rather than
+    # sending an empty interface to the LLM.
+    if not selected:
+        return filtered_json
+
+    focused = {"file_name": filtered_json.get("file_name"), "screens": []}
+    for screen_pos, elements in selected.items():
+        screen = screens[screen_pos]
+        focused["screens"].append(
+            {
+                "id": screen.get("id"),
+                "name": screen.get("name"),
+                "type": screen.get("type"),
+                "elements": elements,
+            }
+        )
+    return focused
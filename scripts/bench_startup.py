@@ -0,0 +1,98 @@
+"""Measure cold-start import time and time-to-first-response of app.main.
+
+Each run starts a fresh interpreter so module caches are cold. Both
+STARTUP_MODE values are measured unless --mode is given:
+
+    python scripts/bench_startup.py --runs 10 --mode lazy
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import asyncio
+import json
+import time
+
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+
+async def first_response():
+    messages = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+status = asyncio.run(first_response())
+responded = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (responded - started) * 1000,
+}))
+"""
+
+
+def run_once(mode: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT,
+        env={**os.environ, "STARTUP_MODE": mode},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=("eager", "lazy"), action="append")
+    args = parser.parse_args()
+
+    for mode in args.mode or ["eager", "lazy"]:
+        samples = [run_once(mode) for _ in range(args.runs)]
+        print(f"STARTUP_MODE={mode}")
+        for key in ("import_ms", "first_response_ms"):
+            values = [sample[key] for sample in samples]
+            print(
+                "  %-18s median=%7.1f min=%7.1f max=%7.1f"
+                % (key, statistics.median(values), min(values), max(values))
+            )
+        print("  status", sorted({sample["status"] for sample in samples}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from app.admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejectedError
+
+
+def _wait_for_queue(controller: AdmissionController, size: int) -> None:
+    deadline = time.monotonic() + 2
+    while controller.stats()["queued"] < size:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def _start(controller, order, name, tenant, lane=INTERACTIVE) -> threading.Thread:
+    def run() -> None:
+        with controller.admit(tenant, lane=lane):
+            order.append(name)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_admission_rejects_after_queue_timeout() -> None:
+    controller = AdmissionController(capacity=1, tenant_limit=1, queue_timeout=0.05)
+    controller.acquire("a")
+
+    with pytest.raises(AdmissionRejectedError) as exc_info:
+        controller.acquire("b")
+
+    assert exc_info.value.retry_after >= 1
+    stats = controller.stats()
+    assert stats["active"] == 1
+    assert stats["queued"] == 0
+    assert stats["rejected"] == 1
+
+    controller.release("a")
+    assert controller.stats()["active"] == 0
+
+
+def test_admission_rejects_when_queue_is_full() -> None:
+    controller = AdmissionController(capacity=1, tenant_limit=1, max_queue=0)
+    controller.acquire("a")
+
+    with pytest.raises(AdmissionRejectedError):
+        controller.acquire("b")
+
+    controller.release("a")
+    assert controller.stats()["rejected"] == 1
+
+
+def test_idle_admission_admits_without_queue_room() -> None:
+    for controller in (
+        AdmissionController(capacity=20),
+        AdmissionController(capacity=4, max_queue=0),
+    ):
+        controller.acquire("t")
+        assert controller.stats()["active"] == 1
+        controller.release("t")
+
+
+def test_admission_rejects_capacity_above_threadpool_budget() -> None:
+    with pytest.raises(ValueError):
+        AdmissionController(capacity=21)
+
+
+def test_admission_queue_leaves_threadpool_room_for_other_routes() -> None:
+    controller = AdmissionController(capacity=4, max_queue=64)
+    assert controller.stats()["max_queue"] == 16
+
+
+def test_admission_round_robins_tenants_and_prefers_interactive() -> None:
+    controller = AdmissionController(capacity=1, tenant_limit=1, queue_timeout=2)
+    controller.acquire("holder")
+
+    order: list[str] = []
+    threads = []
+    for name, tenant, lane in [
+        ("batch", "c", BATCH),
+        ("a1", "a", INTERACTIVE),
+        ("a2", "a", INTERACTIVE),
+        ("b1", "b", INTERACTIVE),
+    ]:
+        threads.append(_start(controller, order, name, tenant, lane))
+        _wait_for_queue(controller, len(threads))
+
+    controller.release("holder")
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order == ["a1", "b1", "a2", "batch"]
+    assert controller.stats()["admitted"] == 5
@@ -1,9 +1,12 @@
+import json
+
 import httpx
 from fastapi.testclient import TestClient
 
+from app.admission import AdmissionController
 from app.figma import FigmaClient
 from app.llm import LLMClient
-from app.main import app, get_figma_client, get_llm_client
+from app.main import app, get_admission, get_figma_client, get_llm_client
 
 
 def override_client():
@@ -45,6 +48,26 @@ def override_llm_client():
 app.dependency_overrides[get_llm_client] = override_llm_client
 
 
+def test_static_assets_are_cached_with_etag_and_gzip() -> None:
+    client = TestClient(app)
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "generate-btn" in response.text
+
+    etag = response.headers["etag"]
+    cached = client.get(
+        "/static/app.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert cached.status_code == 304
+
+    assert client.get("/").headers["content-type"].startswith("text/html")
+    assert client.head("/static/app.js").status_code == 200
+    assert client.get("/static/missing.js").status_code == 404
+
+
 def test_fetch_figma_file_success() -> None:
     client = TestClient(app)
     response = client.post(
@@ -124,3 +147,136 @@ def test_export_guide_success() -> None:
     assert data["file_id"] == "AbCdEf1234"
     assert "markdown" in data
     assert "guide_json" in data
+
+
+def test_fetch_figma_file_large_response_is_gzipped() -> None:
+    def large_client():
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"name": "Demo", "document": {"id": "0:0" * 2000}})
+
+        client = FigmaClient(transport=httpx.MockTransport(handler))
+        try:
+            yield client
+        finally:
+            client.close()
+
+    app.dependency_overrides[get_figma_client] = large_client
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/figma/file",
+            json={
+                "figma_url": "https://www.figma.com/file/AbCdEf1234/My-File",
+                "figma_token": "token",
+            },
+            headers={"Accept-Encoding": "gzip"},
+        )
+    finally:
+        app.dependency_overrides[get_figma_client] = override_client
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["figma_json"]["name"] == "Demo"
+
+
+def test_generate_guide_rejected_when_llm_capacity_is_exhausted() -> None:
+    admission = AdmissionController(capacity=1, tenant_limit=1, queue_timeout=0.01)
+    admission.acquire("busy")
+    app.dependency_overrides[get_admission] = lambda: admission
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/guide/generate",
+            json={
+                "figma_url": "https://www.figma.com/file/AbCdEf1234/My-File",
+                "figma_token": "token",
+            },
+        )
+        stats = client.get("/admission/stats").json()
+    finally:
+        del app.dependency_overrides[get_admission]
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+    assert stats["active"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_generate_guide_with_focus_sends_only_matching_screen(monkeypatch) -> None:
+    import app.main as main_module
+
+    filter_calls = []
+    original_filter = main_module.filter_figma_json
+
+    def counting_filter(data):
+        filter_calls.append(data.get("version"))
+        return original_filter(data)
+
+    monkeypatch.setattr(main_module, "filter_figma_json", counting_filter)
+
+    figma_json = {
+        "name": "Shop",
+        "version": "101",
+        "document": {
+            "id": "0:0",
+            "type": "DOCUMENT",
+            "children": [
+                {
+                    "id": "1:1",
+                    "name": "Catalog",
+                    "type": "FRAME",
+                    "children": [{"id": "2:1", "name": "Search", "type": "INSTANCE"}],
+                },
+                {
+                    "id": "1:2",
+                    "name": "Checkout",
+                    "type": "FRAME",
+                    "children": [{"id": "3:1", "name": "Pay Button", "type": "INSTANCE"}],
+                },
+            ],
+        },
+    }
+    prompts = []
+
+    def figma_client():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=figma_json))
+        client = FigmaClient(transport=transport)
+        try:
+            yield client
+        finally:
+            client.close()
+
+    def llm_client():
+        def handler(request: httpx.Request) -> httpx.Response:
+            prompts.append(json.loads(request.content)["inputs"])
+            return httpx.Response(200, json=[{"generated_text": "MARKDOWN:\nok\n\nJSON:\n{}"}])
+
+        client = LLMClient(transport=httpx.MockTransport(handler), provider="hf")
+        try:
+            yield client
+        finally:
+            client.close()
+
+    app.dependency_overrides[get_figma_client] = figma_client
+    app.dependency_overrides[get_llm_client] = llm_client
+    try:
+        client = TestClient(app)
+        for _ in range(2):
+            response = client.post(
+                "/guide/generate",
+                json={
+                    "figma_url": "https://www.figma.com/file/AbCdEf1234/My-File",
+                    "figma_token": "token",
+                    "focus": "checkout screen",
+                },
+            )
+            assert response.status_code == 200
+    finally:
+        app.dependency_overrides[get_figma_client] = override_client
+        app.dependency_overrides[get_llm_client] = override_llm_client
+
+    assert len(prompts) == 2
+    assert filter_calls == ["101"]
+    for prompt in prompts:
+        assert "Pay Button" in prompt
+        assert "Catalog" not in prompt
@@ -37,3 +37,97 @@ def test_filter_figma_json_extracts_text_and_button() -> None:
     elements = result["screens"][0]["elements"]
     assert any(item["kind"] == "button" for item in elements)
     assert any(item["kind"] == "text" and item["text"] == "Добро пожаловать" for item in elements)
+
+
+def test_filter_figma_json_parallel_matches_sequential() -> None:
+    frames = [
+        {
+            "id": f"1:{index}",
+            "name": f"Screen {index}",
+            "type": "FRAME",
+            "children": [
+                {"id": f"2:{index}", "name": "Submit Button", "type": "INSTANCE"},
+                {"id": f"3:{index}", "name": "Label", "type": "TEXT", "characters": str(index)},
+            ],
+        }
+        for index in range(6)
+    ]
+    figma_json = {"name": "Demo", "document": {"id": "0:0", "type": "DOCUMENT", "children": frames}}
+
+    sequential = filter_figma_json(figma_json, parallel=False)
+    parallel = filter_figma_json(figma_json, parallel=True)
+
+    assert parallel == sequential
+    assert [screen["id"] for screen in parallel["screens"]] == [f"1:{i}" for i in range(6)]
+
+
+def test_filter_figma_json_skips_hidden_and_unrelated_layers() -> None:
+    figma_json = {
+        "name": "Demo",
+        "document": {
+            "id": "0:0",
+            "type": "DOCUMENT",
+            "children": [
+                {
+                    "id": "1:1",
+                    "name": "Main Screen",
+                    "type": "FRAME",
+                    "children": [
+                        {"id": "2:1", "name": "Form Field Group", "type": "GROUP"},
+                        {"id": "2:2", "name": "Search", "type": "INSTANCE"},
+                        {
+                            "id": "2:3",
+                            "name": "Hidden Button",
+                            "type": "INSTANCE",
+                            "visible": False,
+                            "children": [{"id": "2:4", "name": "Label", "type": "TEXT"}],
+                        },
+                    ],
+                }
+            ],
+        },
+    }
+
+    elements = filter_figma_json(figma_json)["screens"][0]["elements"]
+    assert [(item["id"], item["kind"]) for item in elements] == [("2:2", "input")]
+
+
+def test_filter_figma_json_stays_sequential_on_single_worker(monkeypatch) -> None:
+    from app import filtering
+
+    monkeypatch.setattr(filtering, "FILTER_PARALLEL_THRESHOLD", 1)
+    monkeypatch.setattr(filtering, "FILTER_MAX_WORKERS", 1)
+    monkeypatch.setattr(filtering, "_collect_frames_parallel", None)
+
+    frames = [{"id": f"1:{index}", "type": "FRAME", "children": []} for index in range(3)]
+    result = filter_figma_json({"document": {"type": "DOCUMENT", "children": frames}})
+    assert len(result["screens"]) == 3
+
+
+def test_filter_figma_json_parallel_uses_parent_rules(monkeypatch, tmp_path) -> None:
+    from app import filtering
+    from app.rules import compile_rules
+
+    # Simulates a failed hot reload: the file on disk is broken, while the
+    # parent still holds the previously compiled rules.
+    broken = tmp_path / "rules.json"
+    broken.write_text("{broken")
+    monkeypatch.setenv("FILTER_RULES_PATH", str(broken))
+    previous = compile_rules({"rules": [{"kind": "cta", "name": "submit"}]})
+    monkeypatch.setattr(filtering, "get_rules", lambda: previous)
+
+    frames = [
+        {
+            "id": f"1:{index}",
+            "type": "FRAME",
+            "children": [{"id": f"2:{index}", "name": "Submit", "type": "INSTANCE"}],
+        }
+        for index in range(4)
+    ]
+    figma_json = {"document": {"type": "DOCUMENT", "children": frames}}
+
+    sequential = filter_figma_json(figma_json, parallel=False)
+    parallel = filter_figma_json(figma_json, parallel=True)
+
+    assert parallel == sequential
+    assert all(screen["elements"][0]["kind"] == "cta" for screen in parallel["screens"])
@@ -1,4 +1,10 @@
-from app.generation import build_prompt, parse_llm_output
+from app.generation import (
+    STOP_SEQUENCE,
+    build_messages,
+    build_prompt,
+    output_budget,
+    parse_llm_output,
+)
 
 
 def test_build_prompt_contains_fields() -> None:
@@ -13,3 +19,46 @@ def test_parse_llm_output_with_json() -> None:
     markdown, data = parse_llm_output(text)
     assert markdown.startswith("Шаг 1")
     assert data["title"] == "Demo"
+
+
+def test_build_messages_keeps_static_prefix_first() -> None:
+    filtered = {"file_name": "Demo", "screens": []}
+    system_brief, user_brief = build_messages(filtered, "ru", "brief", "user")
+    system_detailed, user_detailed = build_messages(filtered, "en", "detailed", "engineer")
+
+    assert system_brief == system_detailed
+    assert user_brief.startswith("Данные об интерфейсе")
+    assert user_brief.index("Demo") < user_brief.index("Язык: ru")
+    assert user_detailed.endswith("Добавляй технические детали о поведении элементов.")
+
+
+def test_parse_llm_output_drops_text_after_stop_sequence() -> None:
+    text = f"MARKDOWN:\nШаг 1\n\nJSON:\n{{\"title\":\"Demo\"}}\n{STOP_SEQUENCE}\nлишнее"
+    markdown, data = parse_llm_output(text)
+    assert markdown == "Шаг 1"
+    assert data == {"title": "Demo"}
+
+
+def test_output_budget_grows_with_detail_and_elements() -> None:
+    small = {"screens": [{"elements": [{}] * 2}]}
+    limit = {"screens": [{"elements": [{}] * 20}]}
+    large = {"screens": [{"elements": [{}] * 50}]}
+    assert output_budget(small, "brief") < output_budget(large, "brief")
+    assert output_budget(large, "brief") < output_budget(large, "detailed")
+    assert output_budget(large, "brief") == output_budget(limit, "brief")
+
+
+def test_parse_llm_output_ignores_stop_sequence_inside_think() -> None:
+    text = (
+        f"<think>Сначала разметка, потом {STOP_SEQUENCE}.</think>"
+        f"MARKDOWN:\nШаг 1\n\nJSON:\n{{\"title\":\"Demo\"}}\n{STOP_SEQUENCE}"
+    )
+    markdown, data = parse_llm_output(text)
+    assert markdown == "Шаг 1"
+    assert data == {"title": "Demo"}
+
+
+def test_parse_llm_output_drops_truncated_think_block() -> None:
+    markdown, data = parse_llm_output("<think>Пользователь просит руководство, значит")
+    assert "Пользователь" not in markdown
+    assert "title" not in data
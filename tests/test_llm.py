@@ -0,0 +1,74 @@
+import json
+
+import httpx
+
+from app.llm import LLMClient
+
+
+def test_generate_sends_system_message_to_router() -> None:
+    captured = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.update(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    client = LLMClient(
+        base_url="https://router.huggingface.co",
+        provider="hf_router",
+        transport=httpx.MockTransport(handler),
+        reasoning_model=False,
+    )
+
+    assert client.generate("data", system="static", max_new_tokens=100, stop=["END"]) == "ok"
+    assert captured["stop"] == ["END"]
+    assert captured["max_tokens"] == 100
+    assert captured["messages"] == [
+        {"role": "system", "content": "static"},
+        {"role": "user", "content": "data"},
+    ]
+
+    client.close()
+
+
+def test_generate_sends_budget_stop_and_no_think() -> None:
+    captured = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.update(json.loads(request.content))
+        return httpx.Response(200, json=[{"generated_text": "ok"}])
+
+    client = LLMClient(
+        base_url="https://router.huggingface.co/hf-inference/models/Demo",
+        provider="hf",
+        transport=httpx.MockTransport(handler),
+        disable_thinking=True,
+    )
+
+    assert client.generate("data", system="static", max_new_tokens=200, stop=["END"]) == "ok"
+    assert captured["inputs"].startswith("/no_think\nstatic")
+    assert captured["parameters"]["max_new_tokens"] == 200
+    assert captured["parameters"]["stop"] == ["END"]
+
+    client.close()
+
+
+def test_generate_reasoning_model_gets_allowance_and_no_stop() -> None:
+    captured = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.update(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    client = LLMClient(
+        base_url="https://router.huggingface.co",
+        provider="hf_router",
+        transport=httpx.MockTransport(handler),
+        reasoning_model=True,
+        disable_thinking=False,
+    )
+
+    client.generate("data", max_new_tokens=100, stop=["END"])
+    assert "stop" not in captured
+    assert captured["max_tokens"] > 100
+
+    client.close()
@@ -0,0 +1,45 @@
+import httpx
+import pytest
+
+from app.figma import FigmaClient, FigmaRequestError
+from app.llm import LLMClient, LLMRequestError
+from app.replay import RecordReplayTransport
+
+
+def test_record_then_replay_figma_file(tmp_path) -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"name": "Demo"})
+
+    recorder = RecordReplayTransport(
+        str(tmp_path), mode="record", transport=httpx.MockTransport(handler)
+    )
+    client = FigmaClient(transport=recorder)
+    assert client.get_file("AbCdEf1234", "token")["name"] == "Demo"
+    client.close()
+
+    assert len(list(tmp_path.glob("*.json.gz"))) == 1
+
+    player = RecordReplayTransport(
+        str(tmp_path), mode="replay", latency_scale=0, transport=httpx.MockTransport(handler)
+    )
+    client = FigmaClient(transport=player)
+    assert client.get_file("AbCdEf1234", "other-token")["name"] == "Demo"
+    with pytest.raises(FigmaRequestError):
+        client.get_file("ZyXwVu9876", "token")
+    client.close()
+
+    llm = LLMClient(base_url="https://router.huggingface.co", provider="hf", transport=player)
+    with pytest.raises(LLMRequestError):
+        llm.generate("prompt")
+    llm.close()
+
+    assert calls == ["/v1/files/AbCdEf1234"]
+
+
+def test_replay_mode_does_not_open_a_network_transport(tmp_path) -> None:
+    player = RecordReplayTransport(str(tmp_path), mode="replay")
+    assert player._transport is None
+    player.close()
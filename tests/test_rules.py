@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+from app.rules import RulesError, compile_rules, get_rules
+
+
+def test_compile_rules_matches_type_component_and_size() -> None:
+    rules = compile_rules(
+        {
+            "rules": [
+                {"kind": "icon", "types": ["VECTOR"], "max_width": 32, "max_height": 32},
+                {"kind": "button", "component_ids": ["10:1"]},
+                {"kind": "header", "name": r"\bh[1-3]\b"},
+            ]
+        }
+    )
+
+    small = {"width": 24, "height": 24}
+    large = {"width": 200, "height": 200}
+    assert rules.classify({"type": "VECTOR", "absoluteBoundingBox": small}) == "icon"
+    assert rules.classify({"type": "VECTOR", "absoluteBoundingBox": large}) is None
+    assert rules.classify({"type": "INSTANCE", "componentId": "10:1"}) == "button"
+    assert rules.classify({"type": "TEXT", "name": "H1"}) == "header"
+    assert rules.classify({"type": "TEXT", "name": "Heading"}) is None
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        ["("],
+        ["(?i)btn"],
+        ["(?P<x>btn)", "(?P<x>button)"],
+        [r"(b)\1"],
+    ],
+)
+def test_compile_rules_rejects_bad_pattern(patterns) -> None:
+    with pytest.raises(RulesError):
+        compile_rules({"rules": [{"kind": "button", "name": name} for name in patterns]})
+
+
+def test_get_rules_reloads_on_change(tmp_path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [{"kind": "button", "name": "btn"}]}))
+    assert get_rules(str(path)).classify({"name": "btn"}) == "button"
+
+    path.write_text(json.dumps({"rules": [{"kind": "cta", "name": "btn"}]}))
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+    assert get_rules(str(path)).classify({"name": "btn"}) == "cta"
+
+    path.write_text("{broken")
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert get_rules(str(path)).classify({"name": "btn"}) == "cta"
+
+    path.write_text(json.dumps({"rules": [{"kind": "button", "name": "(?i)btn"}]}))
+    os.utime(path, (stat.st_atime, stat.st_mtime + 15))
+    assert get_rules(str(path)).classify({"name": "btn"}) == "cta"
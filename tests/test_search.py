@@ -0,0 +1,85 @@
+from app.search import build_index, get_index, select_focus
+
+
+FILTERED = {
+    "file_name": "Shop",
+    "screens": [
+        {
+            "id": "1:1",
+            "name": "Catalog",
+            "type": "FRAME",
+            "elements": [
+                {"id": "2:1", "name": "Search Field", "type": "INSTANCE", "kind": "input"},
+                {"id": "2:2", "name": "Title", "type": "TEXT", "kind": "text", "text": "Товары"},
+            ],
+        },
+        {
+            "id": "1:2",
+            "name": "Checkout",
+            "type": "FRAME",
+            "elements": [
+                {"id": "3:1", "name": "Pay Button", "type": "INSTANCE", "kind": "button"},
+                {"id": "3:2", "name": "Total", "type": "TEXT", "kind": "text", "text": "Итого"},
+            ],
+        },
+    ],
+}
+
+
+def test_select_focus_by_screen_name() -> None:
+    focused = select_focus(FILTERED, build_index(FILTERED), "guide for the checkout screen")
+    assert [screen["id"] for screen in focused["screens"]] == ["1:2"]
+    assert [item["id"] for item in focused["screens"][0]["elements"]] == ["3:1", "3:2"]
+
+
+def test_select_focus_prefix_and_text_match() -> None:
+    index = build_index(FILTERED)
+    focused = select_focus(FILTERED, index, "how to use sear")
+    assert [item["id"] for item in focused["screens"][0]["elements"]] == ["2:1"]
+
+    focused = select_focus(FILTERED, index, "итого")
+    assert focused["screens"][0]["elements"][0]["id"] == "3:2"
+
+
+def test_select_focus_without_matches_keeps_document() -> None:
+    assert select_focus(FILTERED, build_index(FILTERED), "settings") is FILTERED
+
+
+def test_select_focus_returns_matching_empty_screen() -> None:
+    filtered = {
+        "file_name": "Shop",
+        "screens": FILTERED["screens"] + [
+            {"id": "1:3", "name": "Settings", "type": "FRAME", "elements": []}
+        ],
+    }
+    focused = select_focus(filtered, build_index(filtered), "settings")
+    assert [screen["id"] for screen in focused["screens"]] == ["1:3"]
+    assert focused["screens"][0]["elements"] == []
+
+
+def test_get_index_is_cached_per_version() -> None:
+    builds = []
+
+    def build():
+        builds.append(1)
+        return FILTERED
+
+    first = get_index("AbCdEf1234", "42", build)
+    assert get_index("AbCdEf1234", "42", build) is first
+    assert len(builds) == 1
+    assert get_index("AbCdEf1234", "43", build) is not first
+    assert get_index("AbCdEf1234", "42", build, "rules:2") is not first
+    assert len(builds) == 3
+
+
+def test_get_index_returns_the_document_it_indexed() -> None:
+    get_index("ZyXwVu9876", "7", lambda: FILTERED)
+    catalog = FILTERED["screens"][0]
+    refiltered = {
+        "file_name": "Shop",
+        "screens": [dict(catalog, elements=catalog["elements"][1:])],
+    }
+
+    document, index = get_index("ZyXwVu9876", "7", lambda: refiltered)
+    focused = select_focus(document, index, "search")
+    assert focused["screens"][0]["elements"][0]["id"] == "2:1"